@@ -25,6 +25,8 @@ class ConfigManager:
             'default_prompt': '你现在是一个终端助手,用户输入想要生成的命令,你来输出一个命令,不要任何多余的文本!',
             'max_history': 10
         }
+        # 本地模式下默认连接本机的 OpenAI 兼容服务
+        self.local_base_url = 'http://127.0.0.1:8080/v1'
 
     def save_config(self, config: Dict[str, Any]) -> bool:
         """保存配置到文件"""
@@ -45,27 +47,36 @@ class ConfigManager:
             logger.error(f"无法保存配置文件 {self.config_file}: {e}")
             return False
 
-    def validate_config(self, config: Dict[str, Any]) -> bool:
-        """验证配置是否完整"""
+    def validate_config(self, config: Dict[str, Any], local_mode: bool = False) -> bool:
+        """验证配置是否完整，本地模式下不要求API密钥"""
         for key in self.required_keys:
+            if local_mode and key == 'api_key':
+                continue
             if not config.get(key):
                 return False
         return True
 
-    def initialize_config(self) -> Dict[str, Any]:
+    def initialize_config(self, local_mode: bool = False) -> Dict[str, Any]:
         """初始化配置向导"""
         print("欢迎使用AutoTerminal配置向导！")
         print("请提供以下信息以完成配置：")
 
+        # local_mode 由 --local 参数决定，不写入配置文件
         config = self.default_config.copy()
+        if local_mode:
+            config['base_url'] = self.local_base_url
 
-        # 获取API密钥
+        # 获取API密钥（本地模式下可以留空）
         try:
-            api_key = input("请输入您的API密钥: ").strip()
-            if not api_key:
-                print("错误: API密钥不能为空")
-                return {}
-            config['api_key'] = api_key
+            if local_mode:
+                api_key = input("请输入您的API密钥 (本地模式可留空): ").strip()
+            else:
+                api_key = input("请输入您的API密钥: ").strip()
+                if not api_key:
+                    print("错误: API密钥不能为空")
+                    return {}
+            if api_key:
+                config['api_key'] = api_key
         except EOFError:
             print("\n配置向导已取消。")
             return {}
@@ -76,7 +87,7 @@ class ConfigManager:
         # 获取Base URL
         try:
             base_url = input(
-                f"请输入Base URL (默认: {self.default_config['base_url']}): ").strip()
+                f"请输入Base URL (默认: {config['base_url']}): ").strip()
             if base_url:
                 config['base_url'] = base_url
         except EOFError:
@@ -104,7 +115,7 @@ class ConfigManager:
             print("配置保存失败")
             return {}
 
-    def get_or_create_config(self) -> Dict[str, Any]:
+    def get_or_create_config(self, local_mode: bool = False) -> Dict[str, Any]:
         """获取现有配置或创建新配置"""
         # 尝试从文件加载配置
         if os.path.exists(self.config_file):
@@ -112,7 +123,7 @@ class ConfigManager:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     config = json.load(f)
                 # 验证配置
-                if self.validate_config(config):
+                if self.validate_config(config, local_mode=local_mode):
                     print("已加载现有配置")
                     return config
                 else:
@@ -121,4 +132,4 @@ class ConfigManager:
                 logger.warning(f"无法读取配置文件 {self.config_file}: {e}")
 
         # 如果配置不存在或不完整，启动初始化向导
-        return self.initialize_config()
+        return self.initialize_config(local_mode=local_mode)
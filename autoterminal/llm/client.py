@@ -1,20 +1,160 @@
 from openai import OpenAI
 from typing import Dict, Any, Optional, List
 import os
+import math
+import httpx
+from autoterminal.utils.helpers import extract_command
 from autoterminal.utils.logger import logger
 
+DEFAULT_MAX_TOKENS = 100
+# 代码块结束后紧跟的解释文字不再生成；单行命令由流式解析提前结束
+DEFAULT_STOP_SEQUENCES = ["\n```\n"]
+JSON_OUTPUT_PROMPT = '\n请以 JSON 格式输出: {"command": "<命令>"}，没有合适的命令时 command 为空字符串。'
+
+# 本地模式默认参数：单行命令只需少量 token，小模型上下文窗口有限
+LOCAL_DEFAULT_MAX_TOKENS = 64
+LOCAL_DEFAULT_MAX_CONTEXT_TOKENS = 1024
+# 本地模式下命令行之后的空行或代码块结束标记即停止生成
+LOCAL_STOP_SEQUENCES = ["\n\n", "\n```"]
+
+# 进程内共享的 HTTP 客户端，复用 HTTP/1.1 keep-alive 连接
+_shared_http_client: Optional[httpx.Client] = None
+
+
+def get_shared_http_client() -> httpx.Client:
+    """获取共享的 httpx 客户端（惰性创建）"""
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        logger.debug("创建共享 HTTP 客户端 (keep-alive)")
+        _shared_http_client = httpx.Client(
+            http2=False,
+            # 连接超时要短以便快速发现服务未启动；读取超时与 OpenAI SDK 默认值一致，
+            # 给首次请求时才加载模型的服务（如 Ollama）留出时间
+            timeout=httpx.Timeout(600.0, connect=2.0),
+            limits=httpx.Limits(max_connections=4,
+                                max_keepalive_connections=4,
+                                keepalive_expiry=60.0)
+        )
+    return _shared_http_client
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符约 1 字符 1 token，其余约 4 字符 1 token"""
+    wide = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return wide + math.ceil((len(text) - wide) / 4)
+
 
 class LLMClient:
     """LLM客户端，封装OpenAI API调用"""
 
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self.local_mode = bool(config.get('local_mode', False))
         logger.info("初始化 LLM 客户端")
         logger.debug(f"使用模型: {config.get('model')}, Base URL: {config.get('base_url')}")
-        self.client = OpenAI(
-            api_key=config.get('api_key'),
-            base_url=config.get('base_url')
-        )
+        if self.local_mode:
+            logger.info("使用本地模型后端")
+            # 本地 OpenAI 兼容服务通常不校验密钥，失败时直接报错而不是重试
+            self.client = OpenAI(
+                api_key=config.get('api_key') or 'local',
+                base_url=config.get('base_url'),
+                http_client=get_shared_http_client(),
+                max_retries=0
+            )
+        else:
+            self.client = OpenAI(
+                api_key=config.get('api_key'),
+                base_url=config.get('base_url')
+            )
+
+    def warmup(self) -> None:
+        """启动检查：健康检查并发送预加载请求让服务端载入模型（由 --warmup 单独触发）"""
+        try:
+            logger.debug("模型服务健康检查")
+            self.client.models.list()
+        except Exception as e:
+            logger.error(f"模型服务不可用: {str(e)}")
+            raise Exception(f"模型服务不可用: {str(e)}")
+
+        try:
+            logger.debug("发送模型预加载请求")
+            self.client.chat.completions.create(
+                model=self.config.get('model'),
+                messages=[{"role": "user", "content": "ping"}],
+                temperature=0,
+                max_tokens=1
+            )
+        except Exception as e:
+            # 预加载失败不影响后续调用，仅记录警告
+            logger.warning(f"模型预加载失败: {str(e)}")
+
+    def _stream_command(self, request_params: Dict[str, Any]) -> str:
+        """流式生成命令，解析出完整命令后立即中止响应"""
+        stream = self.client.chat.completions.create(stream=True, **request_params)
+        text = ''
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text += chunk.choices[0].delta.content or ''
+                if extract_command(text, require_complete=True) is not None:
+                    logger.debug("已解析出完整命令，提前结束生成")
+                    break
+        finally:
+            # 关闭连接以通知服务端停止生成
+            stream.close()
+        return text.strip()
+
+    @staticmethod
+    def _build_system_prompt(prompt: str, history_lines: List[str],
+                             dir_entries: List[str], shell_lines: List[str]) -> str:
+        """拼接系统提示和上下文信息"""
+        system_prompt = prompt
+
+        # 添加历史命令上下文（最新的在前）
+        if history_lines:
+            system_prompt += "\n最近执行的命令历史:\n"
+            for i, line in enumerate(history_lines, 1):
+                system_prompt += f"{i}. {line}\n"
+
+        # 添加当前目录内容上下文
+        if dir_entries:
+            system_prompt += "\n当前目录下的文件和文件夹:\n" + "\n".join(dir_entries)
+
+        # 添加系统 Shell 历史上下文（最新的在后）
+        if shell_lines:
+            system_prompt += "\n系统Shell最近执行的命令:\n"
+            for i, cmd in enumerate(shell_lines, 1):
+                system_prompt += f"{i}. {cmd}\n"
+
+        return system_prompt
+
+    def _cap_context(self, prompt: str, history_lines: List[str],
+                     dir_entries: List[str], shell_lines: List[str]) -> str:
+        """
+        本地模式下按条目裁剪上下文，避免超出小模型的上下文窗口
+
+        依次丢弃目录内容、最旧的命令历史和最旧的 Shell 历史，直到估算的 token 数不超过上限
+        """
+        max_tokens = self.config.get('local_max_context_tokens', LOCAL_DEFAULT_MAX_CONTEXT_TOKENS)
+        system_prompt = self._build_system_prompt(prompt, history_lines, dir_entries, shell_lines)
+        total = estimate_tokens(system_prompt)
+        if total <= max_tokens:
+            return system_prompt
+
+        history_lines = list(history_lines)
+        dir_entries = list(dir_entries)
+        shell_lines = list(shell_lines)
+        while total > max_tokens and dir_entries:
+            total -= estimate_tokens(dir_entries.pop() + "\n")
+        while total > max_tokens and history_lines:
+            total -= estimate_tokens(history_lines.pop() + "\n")
+        while total > max_tokens and shell_lines:
+            total -= estimate_tokens(shell_lines.pop(0) + "\n")
+
+        logger.debug(f"上下文超过 {max_tokens} tokens，已裁剪为 {len(history_lines)} 条命令历史、"
+                     f"{len(dir_entries)} 个目录条目、{len(shell_lines)} 条 Shell 历史")
+        return self._build_system_prompt(prompt, history_lines, dir_entries, shell_lines)
 
     def generate_command(self, user_input: str, prompt: Optional[str] = None,
                          history: Optional[List[Dict[str, Any]]] = None,
@@ -35,26 +175,21 @@ class LLMClient:
                     '你现在是一个终端助手，用户输入想要生成的命令,你来输出一个命令,不要任何多余的文本!')
 
         # 构建系统提示，包含上下文信息
-        system_prompt = prompt
-
-        # 添加历史命令上下文
-        if history:
-            history_context = "\n最近执行的命令历史:\n"
-            for i, entry in enumerate(reversed(history), 1):
-                history_context += f"{i}. 用户输入: {entry.get('user_input', '')} -> 生成命令: {entry.get('generated_command', '')}\n"
-            system_prompt += history_context
+        history_lines = [
+            f"用户输入: {entry.get('user_input', '')} -> 生成命令: {entry.get('generated_command', '')}"
+            for entry in reversed(history or [])
+        ]
+        dir_entries = list(current_dir_content or [])
+        shell_lines = list(shell_history or [])
 
-        # 添加当前目录内容上下文
-        if current_dir_content:
-            dir_context = "\n当前目录下的文件和文件夹:\n" + "\n".join(current_dir_content)
-            system_prompt += dir_context
+        if self.local_mode:
+            system_prompt = self._cap_context(prompt, history_lines, dir_entries, shell_lines)
+        else:
+            system_prompt = self._build_system_prompt(prompt, history_lines, dir_entries, shell_lines)
 
-        # 添加系统 Shell 历史上下文
-        if shell_history:
-            shell_context = "\n系统Shell最近执行的命令:\n"
-            for i, cmd in enumerate(shell_history, 1):
-                shell_context += f"{i}. {cmd}\n"
-            system_prompt += shell_context
+        json_output = self.config.get('json_output', False)
+        if json_output:
+            system_prompt += JSON_OUTPUT_PROMPT
 
         # 当用户输入为空时，使用特殊的提示来触发推荐模式
         if not user_input:
@@ -71,14 +206,27 @@ class LLMClient:
             logger.info(f"调用 LLM 生成命令，用户输入: '{user_input if user_input else '(推荐模式)'}'")
             logger.debug(f"系统提示长度: {len(system_prompt)} 字符")
 
-            response = self.client.chat.completions.create(
-                model=self.config.get('model'),
-                messages=messages,
-                temperature=0.1,
-                max_tokens=100
-            )
+            request_params = {
+                'model': self.config.get('model'),
+                'messages': messages,
+                'temperature': 0.1,
+                'max_tokens': self.config.get('max_tokens', DEFAULT_MAX_TOKENS)
+            }
+            if self.local_mode:
+                request_params['max_tokens'] = self.config.get(
+                    'local_max_tokens', LOCAL_DEFAULT_MAX_TOKENS)
+            if json_output:
+                # JSON 模式下输出可能跨行，不设置停止序列
+                request_params['response_format'] = {"type": "json_object"}
+            else:
+                default_stop = LOCAL_STOP_SEQUENCES if self.local_mode else DEFAULT_STOP_SEQUENCES
+                request_params['stop'] = self.config.get('stop_sequences', default_stop)
 
-            command = response.choices[0].message.content.strip()
+            if self.config.get('stream', True):
+                command = self._stream_command(request_params)
+            else:
+                response = self.client.chat.completions.create(**request_params)
+                command = (response.choices[0].message.content or '').strip()
             logger.info(f"LLM 返回命令: '{command}'")
             return command
         except Exception as e:
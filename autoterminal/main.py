@@ -25,6 +25,8 @@ def main():
     parser.add_argument('--base-url', help='Base URL')
     parser.add_argument('--model', help='模型名称')
     parser.add_argument('--history-count', type=int, help='历史命令数量')
+    parser.add_argument('--local', action='store_true', help='使用本地 OpenAI 兼容模型服务')
+    parser.add_argument('--warmup', action='store_true', help='检查模型服务并预加载模型后退出')
 
     args = parser.parse_args()
 
@@ -38,23 +40,43 @@ def main():
     config = config_loader.get_config()
 
     # 命令行参数优先级最高
+    cli_overrides = {}
     if args.api_key:
-        config['api_key'] = args.api_key
+        cli_overrides['api_key'] = args.api_key
     if args.base_url:
-        config['base_url'] = args.base_url
+        cli_overrides['base_url'] = args.base_url
     if args.model:
-        config['model'] = args.model
+        cli_overrides['model'] = args.model
+    if args.local:
+        cli_overrides['local_mode'] = True
+    config.update(cli_overrides)
 
     # 获取历史命令数量配置
     history_count = args.history_count or config.get('max_history', 10)
 
     # 如果配置不完整，使用配置管理器初始化
     config_manager = ConfigManager()
-    if not all([config.get('api_key'), config.get('base_url'), config.get('model')]):
-        config = config_manager.get_or_create_config()
+    # 本地模式下不要求 API 密钥
+    required_values = [config.get('base_url'), config.get('model')]
+    if not config.get('local_mode'):
+        required_values.append(config.get('api_key'))
+    if not all(required_values):
+        config = config_manager.get_or_create_config(local_mode=bool(config.get('local_mode')))
         if not config:
             logger.error("缺少必要的配置参数，请通过命令行参数或配置文件提供API密钥、Base URL和模型名称。")
             return 1
+        # 配置向导生成的配置同样以命令行参数为准
+        config.update(cli_overrides)
+
+    # 预热模式：只做健康检查和模型预加载，不生成命令
+    if args.warmup:
+        try:
+            LLMClient(config).warmup()
+        except Exception as e:
+            logger.error(f"模型预热失败: {e}")
+            return 1
+        print("模型服务已就绪。")
+        return 0
 
     # 如果有命令行参数输入，直接处理
     if user_input:
@@ -1,17 +1,225 @@
 import os
-from typing import List
+import re
+import json
+import shutil
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from autoterminal.utils.logger import logger
 
+CODE_FENCE = "```"
+# 以冒号结尾的行视为说明文字（如 "可以使用以下命令:"）
+LEAD_IN_SUFFIXES = (':', '：')
+# 不在 PATH 中但可以作为命令开头的 Shell 关键字和内建命令
+SHELL_WORDS = {
+    '.', ':', '!', '[', '[[', '(', '{', 'alias', 'case', 'cd', 'command', 'echo', 'eval',
+    'exec', 'exit', 'export', 'for', 'function', 'history', 'if', 'popd', 'printf',
+    'pushd', 'read', 'set', 'source', 'test', 'time', 'type', 'ulimit', 'umask',
+    'unalias', 'unset', 'until', 'while',
+}
+# 需要成对出现的 Shell 结构：开始关键字 -> 结束关键字
+BLOCK_OPENERS = {'if': 'fi', 'case': 'esac', 'do': 'done', '{': '}'}
+# 以这些符号结尾的行表示命令尚未结束
+CONTINUATION_SUFFIXES = ('|', '&&', '||', '\\')
+
+_JSON_START = re.compile(r'^\{\s*("|\}|$)')
+_INLINE_CODE = re.compile(r'`([^`\n]+)`')
+_HEREDOC = re.compile(r'(?<!<)<<-?\s*[\'"]?([A-Za-z_][A-Za-z0-9_]*)[\'"]?')
+_SEGMENT_SEPARATORS = re.compile(r';|&&|\|\||\||\(|\)')
+_QUOTED = re.compile(r"'[^']*'|\"(?:\\.|[^\"\\])*\"")
+_ARITHMETIC = re.compile(r'\$\(\(.*?\)\)')
+_COMMAND_NAME = re.compile(r'^[a-z0-9_./~-][\w.+/~-]*$')
+
+
+def _parse_json_command(text: str) -> Optional[str]:
+    """解析 JSON 格式的回复 {"command": "..."}，格式不对或没有 command 字段时返回 None"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(data, dict) and isinstance(data.get('command'), str):
+        return data['command'].strip()
+    return None
+
+
+@lru_cache(maxsize=256)
+def _is_known_command(name: str) -> bool:
+    """判断是否是 Shell 关键字、内建命令、路径或 PATH 中的可执行文件"""
+    if name in SHELL_WORDS or name.startswith(('./', '../', '/', '~/')):
+        return True
+    return shutil.which(name) is not None
+
+
+def _normalize_line(line: str) -> str:
+    """移除行两侧的提示符，以及包裹整行的反引号或引号"""
+    line = line.strip()
+    if line.startswith('$ '):
+        line = line[2:].lstrip()
+    for quote in ('`', '"', "'"):
+        if len(line) > 1 and line.startswith(quote) and line.endswith(quote) and line.count(quote) == 2:
+            line = line[1:-1].strip()
+    return line
+
+
+def _looks_like_command(line: str) -> bool:
+    """判断一行文本是否像一条可执行的命令，而不是说明文字"""
+    line = _normalize_line(line)
+    if not line:
+        return False
+    first = line.split()[0]
+    # 以变量赋值开头，如 FOO=bar make
+    if re.match(r'^[A-Za-z_][A-Za-z0-9_]*=', first):
+        return True
+    return _is_known_command(first)
+
+
+def _is_unfinished(lines: List[str]) -> bool:
+    """判断多行命令是否还没有结束（未闭合的 here-document、循环、条件或续行符）"""
+    heredoc = None
+    depth = 0
+    for line in lines:
+        if heredoc is not None:
+            if line.strip() == heredoc:
+                heredoc = None
+            continue
+        # 引号内的文本和算术展开 $((...)) 中的关键字、<< 不参与判断
+        code = _ARITHMETIC.sub('', line)
+        quoted = [match.span() for match in _QUOTED.finditer(code)]
+        for segment in _SEGMENT_SEPARATORS.split(_QUOTED.sub('""', code)):
+            words = segment.split()
+            if not words:
+                continue
+            if words[0] in BLOCK_OPENERS:
+                depth += 1
+            elif words[0] in BLOCK_OPENERS.values():
+                depth -= 1
+        for match in _HEREDOC.finditer(code):
+            if not any(start <= match.start() < end for start, end in quoted):
+                heredoc = match.group(1)
+                break
+    return heredoc is not None or depth > 0 or lines[-1].rstrip().endswith(CONTINUATION_SUFFIXES)
+
+
+def _join_command_lines(lines: List[str]) -> str:
+    """拼接多行命令，移除首行的提示符和包裹的引号"""
+    if len(lines) == 1:
+        return _normalize_line(lines[0])
+    first = lines[0].strip()
+    if first.startswith('$ '):
+        first = first[2:].lstrip()
+    return '\n'.join([first] + [line.rstrip() for line in lines[1:]]).strip()
+
+
+def _find_fenced_block(lines: List[str]) -> Optional[Tuple[List[str], bool]]:
+    """
+    查找第一个非空代码块，返回块内的行以及代码块是否已经闭合
+
+    回复中只有空代码块时返回空列表；没有代码块时返回 None
+    """
+    content = None
+    seen_empty = False
+    for line in lines:
+        if line.strip().startswith(CODE_FENCE):
+            if content is None:
+                content = []
+                continue
+            if any(item.strip() for item in content):
+                return content, True
+            # 跳过空代码块
+            seen_empty = True
+            content = None
+            continue
+        if content is not None:
+            content.append(line)
+    if content is not None:
+        return content, False
+    if seen_empty:
+        return [], True
+    return None
+
+
+def _extend_command(lines: List[str], start: int) -> List[str]:
+    """从 start 开始收集命令行，命令未结束（续行、未闭合的结构）时继续读入下一行"""
+    block = [lines[start]]
+    index = start + 1
+    while index < len(lines) and _is_unfinished(block):
+        block.append(lines[index])
+        index += 1
+    return block
+
+
+def _strip_comment(line: str) -> str:
+    """移除行尾注释"""
+    return re.sub(r'\s+#.*$', '', line).strip()
+
+
+def extract_command(text: str, require_complete: bool = False) -> Optional[str]:
+    """
+    从模型回复中提取命令，兼容代码块、JSON、行内代码和带解释的回复
+
+    Args:
+        text: 模型回复文本（流式输出时可以是部分文本）
+        require_complete: 为 True 时仅在确定命令已经完整输出时返回，用于提前结束流式生成
+
+    Returns:
+        提取到的命令；没有找到命令时返回 None
+    """
+    stripped = text.strip()
+    if _JSON_START.match(stripped):
+        # JSON 回复只按 JSON 解析，不再当作普通文本
+        return _parse_json_command(stripped)
+
+    lines = text.split('\n')
+    if require_complete:
+        # 流式输出时最后一段还没有以换行结束，可能仍在输出
+        lines.pop()
+
+    fenced = _find_fenced_block(lines)
+    if fenced is not None:
+        content, closed = fenced
+        if require_complete and not closed:
+            return None
+        block = '\n'.join(content).strip()
+        if _JSON_START.match(block):
+            return _parse_json_command(block)
+        if not block:
+            # 空代码块表示模型没有给出命令（推荐模式下上下文不足时）
+            return ''
+        return _join_command_lines(block.split('\n'))
+
+    for index, line in enumerate(lines):
+        if not _looks_like_command(line):
+            continue
+        block = _extend_command(lines, index)
+        if require_complete and _is_unfinished(block):
+            return None
+        return _join_command_lines(block)
+
+    # 说明文字中的行内代码，如 "使用 `ls -la` 查看"
+    for line in lines:
+        match = _INLINE_CODE.search(line)
+        if match and match.group(1).strip():
+            return match.group(1).strip()
+
+    if require_complete:
+        return None
+
+    # 兜底：取第一行不像说明文字的内容，优先选择形如命令名开头的行
+    candidates = [
+        index for index, line in enumerate(lines)
+        if _normalize_line(_strip_comment(line))
+        and not _strip_comment(line).endswith(LEAD_IN_SUFFIXES)
+        and not line.strip().startswith(CODE_FENCE)
+    ]
+    if not candidates:
+        return None
+    preferred = [index for index in candidates if _COMMAND_NAME.match(_normalize_line(lines[index]).split()[0])]
+    block = _extend_command(lines, (preferred or candidates)[0])
+    return _join_command_lines(block)
+
 
 def clean_command(command: str) -> str:
-    """清理命令字符串"""
-    # 移除可能的引号和多余空格
-    command = command.strip()
-    if command.startswith('"') and command.endswith('"'):
-        command = command[1:-1]
-    if command.startswith("'") and command.endswith("'"):
-        command = command[1:-1]
-    return command.strip()
+    """清理命令字符串，从模型回复中提取出可执行的命令"""
+    return extract_command(command) or ''
 
 
 def get_shell_history(count: int = 20) -> List[str]:
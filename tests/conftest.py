@@ -0,0 +1,34 @@
+import os
+
+# 测试时不写入 ~/.autoterminal 下的日志文件
+os.environ.setdefault("AUTOTERMINAL_FILE_LOG", "false")
+
+import pytest  # noqa: E402
+
+from stub_server import StubOpenAIServer  # noqa: E402
+
+
+@pytest.fixture
+def stub_server():
+    server = StubOpenAIServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def stream_server():
+    """逐行流式返回回复的测试服务，每个分片之间有延迟"""
+    server = StubOpenAIServer(chunk_delay=0.05).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def local_config(stub_server):
+    """指向测试服务的本地模式配置（不含 API 密钥）"""
+    return {
+        'local_mode': True,
+        'base_url': stub_server.base_url,
+        'model': 'stub-model',
+        'stream': False,
+    }
@@ -0,0 +1,133 @@
+"""用于测试的 OpenAI 兼容 HTTP 服务（仅依赖标准库）"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _record(self, body: Optional[Dict[str, Any]]) -> None:
+        self.server.stub.requests.append({
+            'method': self.command,
+            'path': self.path,
+            'headers': {k.lower(): v for k, v in self.headers.items()},
+            'body': body,
+            'client_port': self.client_address[1],
+        })
+
+    def _send_json(self, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._record(None)
+        if self.path.endswith('/models'):
+            self._send_json({
+                'object': 'list',
+                'data': [{'id': 'stub-model', 'object': 'model', 'created': 0, 'owned_by': 'stub'}]
+            })
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        self._record(body)
+        if not self.path.endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        if body.get('stream'):
+            self._send_stream(body)
+        else:
+            self._send_json({
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': 0,
+                'model': body.get('model'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': self.server.stub.reply},
+                    'finish_reason': 'stop'
+                }]
+            })
+
+    def _send_stream(self, body: Dict[str, Any]) -> None:
+        stub = self.server.stub
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        deltas = [{'content': piece} for piece in stub.stream_chunks()]
+        deltas.append(None)
+        try:
+            for delta in deltas:
+                chunk = {
+                    'id': 'chatcmpl-stub',
+                    'object': 'chat.completion.chunk',
+                    'created': 0,
+                    'model': body.get('model'),
+                    'choices': [{
+                        'index': 0,
+                        'delta': delta or {},
+                        'finish_reason': None if delta else 'stop'
+                    }]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                if delta:
+                    stub.chunks_sent += 1
+                time.sleep(stub.chunk_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            stub.aborted = True
+
+
+class StubOpenAIServer:
+    """记录收到的请求并返回固定回复的 OpenAI 兼容服务"""
+
+    def __init__(self, reply: str = "ls -la", chunks: Optional[List[str]] = None,
+                 chunk_delay: float = 0.0):
+        self.reply = reply
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.requests: List[Dict[str, Any]] = []
+        self.chunks_sent = 0
+        self.aborted = False
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def stream_chunks(self) -> List[str]:
+        """流式输出的分片，默认按行切分回复"""
+        if self.chunks is not None:
+            return self.chunks
+        return self.reply.splitlines(keepends=True)
+
+    def chat_requests(self) -> List[Dict[str, Any]]:
+        return [r for r in self.requests if r['path'].endswith('/chat/completions')]
+
+    def start(self) -> "StubOpenAIServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,22 @@
+import json
+
+from autoterminal.config.manager import ConfigManager
+
+
+def test_local_wizard_defaults_to_local_server(tmp_path, monkeypatch):
+    config_file = tmp_path / "config.json"
+    # API 密钥、Base URL、模型名称均直接回车
+    monkeypatch.setattr('builtins.input', lambda prompt='': '')
+
+    config = ConfigManager(str(config_file)).initialize_config(local_mode=True)
+
+    assert config['base_url'] == 'http://127.0.0.1:8080/v1'
+    assert 'api_key' not in config
+    saved = json.loads(config_file.read_text(encoding='utf-8'))
+    assert 'local_mode' not in saved
+
+
+def test_remote_wizard_requires_api_key(tmp_path, monkeypatch):
+    monkeypatch.setattr('builtins.input', lambda prompt='': '')
+
+    assert ConfigManager(str(tmp_path / "config.json")).initialize_config() == {}
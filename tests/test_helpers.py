@@ -0,0 +1,81 @@
+import pytest
+
+from autoterminal.utils.helpers import clean_command, extract_command
+
+
+@pytest.mark.parametrize("reply, expected", [
+    # 纯命令和简单包裹
+    ("ls -la", "ls -la"),
+    ("  'ls -la'  ", "ls -la"),
+    ("`df -h`", "df -h"),
+    ("$ du -sh *", "du -sh *"),
+    ("echo `date`", "echo `date`"),
+    ("ls -la # lists files:", "ls -la # lists files:"),
+    ("", ""),
+    # 代码块
+    ("```bash\nls -la\n```", "ls -la"),
+    ("```\nls -la\n```", "ls -la"),
+    ("Here is the command:\n\n```bash\nfind . -name '*.py'\n```\nThis finds files.", "find . -name '*.py'"),
+    ("```bash\ncd build\nmake\n```", "cd build\nmake"),
+    # 空代码块表示没有命令
+    ("```bash\n```", ""),
+    ("```\n```", ""),
+    ("```bash\n\n```", ""),
+    ("```", ""),
+    # JSON
+    ('{"command": "git status"}', "git status"),
+    ('{"command": ""}', ""),
+    ('```json\n{"command": "ls -la"}\n```', "ls -la"),
+    ('{"cmd": "ls"}', ""),
+    ('{"command": "ls', ""),
+    ("{ echo a; echo b; } > out", "{ echo a; echo b; } > out"),
+    # 带说明文字的回复
+    ("Here is the command\nls -la\n", "ls -la"),
+    ("可以使用：\ndf -h", "df -h"),
+    ("ls -la\nThis lists files.", "ls -la"),
+    ("git status\ngit status shows the working tree.", "git status"),
+    ("cd build\nmake", "cd build"),
+    ("To list files, use `ls -la`.", "ls -la"),
+    ("`ls` and `pwd`", "ls"),
+    # 续行和多行命令
+    ("tar czf a.tgz \\\n  dir/", "tar czf a.tgz \\\n  dir/"),
+    ("ps aux |\n  grep python", "ps aux |\n  grep python"),
+    ("for f in *; do\n  echo $f\ndone", "for f in *; do\n  echo $f\ndone"),
+    ("if [ -f a ]; then\n  cat a\nfi\nThis prints a.", "if [ -f a ]; then\n  cat a\nfi"),
+    ("cat <<EOF\nhello\nEOF", "cat <<EOF\nhello\nEOF"),
+    ("cat <<'EOF'\nhello\nEOF\nThis prints hello.", "cat <<'EOF'\nhello\nEOF"),
+    # 引号和算术展开中的关键字不影响命令边界
+    ('git commit -m "fix(case handling): trim input"\nThis commits your staged changes.\nRun git push afterwards.',
+     'git commit -m "fix(case handling): trim input"'),
+    ('grep -E "error|do not" log.txt\nThis finds errors.', 'grep -E "error|do not" log.txt'),
+    ("echo $((a<<b))\nThis shifts a.", "echo $((a<<b))"),
+])
+def test_clean_command(reply, expected):
+    assert clean_command(reply) == expected
+
+
+@pytest.mark.parametrize("partial", [
+    "ls",
+    "Sure:\n",
+    "Here is the command\n",
+    "```bash\nls -la\n",
+    "for f in *; do\n",
+    "cat <<EOF\nhello\n",
+    "ps aux |\n",
+    '{"command": "ls',
+])
+def test_extract_command_waits_for_incomplete_reply(partial):
+    assert extract_command(partial, require_complete=True) is None
+
+
+@pytest.mark.parametrize("partial, expected", [
+    ("ls -la\n", "ls -la"),
+    ("ls -la\nThis ", "ls -la"),
+    ("Here is the command\nls -la\n", "ls -la"),
+    ("```bash\nls -la\n```\n", "ls -la"),
+    ("for f in *; do\n  echo $f\ndone\n\n", "for f in *; do\n  echo $f\ndone"),
+    ("To list files, use `ls -la`.\n", "ls -la"),
+    ('{"command": "ls -la"}', "ls -la"),
+])
+def test_extract_command_detects_complete_reply(partial, expected):
+    assert extract_command(partial, require_complete=True) == expected
@@ -0,0 +1,156 @@
+import socket
+
+import pytest
+
+from autoterminal.llm.client import (
+    DEFAULT_STOP_SEQUENCES,
+    LOCAL_DEFAULT_MAX_TOKENS,
+    LOCAL_STOP_SEQUENCES,
+    LLMClient,
+    get_shared_http_client,
+)
+from autoterminal.utils.helpers import clean_command
+
+
+def _system_prompt(stub_server):
+    return stub_server.chat_requests()[-1]['body']['messages'][0]['content']
+
+
+def test_local_mode_does_not_require_api_key(stub_server, local_config):
+    client = LLMClient(local_config)
+
+    # 构造客户端时不发送任何请求
+    assert stub_server.requests == []
+    assert client.generate_command("列出文件") == "ls -la"
+    assert stub_server.requests[0]['headers']['authorization'] == "Bearer local"
+
+
+def test_warmup_sends_health_check_and_preload(stub_server, local_config):
+    LLMClient(local_config).warmup()
+
+    assert [(r['method'], r['path']) for r in stub_server.requests] == [
+        ('GET', '/v1/models'),
+        ('POST', '/v1/chat/completions'),
+    ]
+    assert stub_server.requests[1]['body']['max_tokens'] == 1
+
+
+def test_warmup_fails_when_server_unavailable(local_config):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    local_config['base_url'] = f"http://127.0.0.1:{port}/v1"
+
+    with pytest.raises(Exception, match="模型服务不可用"):
+        LLMClient(local_config).warmup()
+
+
+def test_local_mode_request_params(stub_server, local_config):
+    LLMClient(local_config).generate_command("列出文件")
+
+    body = stub_server.chat_requests()[0]['body']
+    assert body['max_tokens'] == LOCAL_DEFAULT_MAX_TOKENS
+    assert body['stop'] == LOCAL_STOP_SEQUENCES
+
+
+def test_stop_sequences_override(stub_server, local_config):
+    local_config['stop_sequences'] = ["\n"]
+    LLMClient(local_config).generate_command("列出文件")
+
+    assert stub_server.chat_requests()[0]['body']['stop'] == ["\n"]
+
+
+def test_remote_mode_uses_default_stop_sequences(stub_server, local_config):
+    local_config['local_mode'] = False
+    local_config['api_key'] = "sk-test"
+    LLMClient(local_config).generate_command("列出文件")
+
+    assert stub_server.chat_requests()[0]['body']['stop'] == DEFAULT_STOP_SEQUENCES
+
+
+def test_local_mode_reuses_keep_alive_connection(stub_server, local_config):
+    client = LLMClient(local_config)
+    client.generate_command("列出文件")
+    client.generate_command("查看磁盘")
+
+    assert LLMClient(local_config).client._client is get_shared_http_client()
+    assert get_shared_http_client().timeout.read == 600.0
+    ports = {r['client_port'] for r in stub_server.chat_requests()}
+    assert len(ports) == 1
+
+
+def test_cap_context_drops_whole_entries(stub_server, local_config):
+    local_config['local_max_context_tokens'] = 120
+    history = [
+        {'user_input': f"旧命令{i}", 'generated_command': f"echo {i}"} for i in range(10)
+    ]
+    shell_history = [f"git log -{i}" for i in range(10)]
+
+    LLMClient(local_config).generate_command(
+        "列出文件",
+        history=history,
+        current_dir_content=[f"file_{i}.txt" for i in range(200)],
+        shell_history=shell_history,
+    )
+
+    system_prompt = _system_prompt(stub_server)
+    assert "当前目录下的文件和文件夹" not in system_prompt
+    # 最新的历史记录和 Shell 命令被保留，且每行完整
+    assert "1. 用户输入: 旧命令9 -> 生成命令: echo 9\n" in system_prompt
+    assert system_prompt.endswith("git log -9\n")
+    assert "旧命令0" not in system_prompt
+
+
+def test_context_is_not_capped_outside_local_mode(stub_server, local_config):
+    local_config['local_mode'] = False
+    local_config['api_key'] = "sk-test"
+    local_config['local_max_context_tokens'] = 10
+
+    LLMClient(local_config).generate_command(
+        "列出文件", current_dir_content=["a.txt", "b.txt"])
+
+    assert _system_prompt(stub_server).endswith("a.txt\nb.txt")
+
+
+def _stream_config(server):
+    return {'base_url': server.base_url, 'model': 'stub-model', 'api_key': "sk-test"}
+
+
+def test_stream_stops_after_complete_command(stream_server):
+    stream_server.reply = "ls -la\n" + "This command lists all files.\n" * 20
+
+    command = LLMClient(_stream_config(stream_server)).generate_command("列出文件")
+
+    assert clean_command(command) == "ls -la"
+    assert stream_server.chat_requests()[0]['body']['stream'] is True
+    # 解析出命令后不再读取剩余的解释文字
+    assert command.count("This command") <= 1
+    assert stream_server.chunks_sent < 20
+
+
+def test_stream_skips_leading_prose(stream_server):
+    stream_server.reply = "Here is the command\nls -la\n\nIt lists files.\n"
+
+    command = LLMClient(_stream_config(stream_server)).generate_command("列出文件")
+
+    assert clean_command(command) == "ls -la"
+
+
+def test_stream_keeps_multi_line_command(stream_server):
+    stream_server.reply = "for f in *; do\n  echo $f\ndone\n"
+
+    command = LLMClient(_stream_config(stream_server)).generate_command("打印文件名")
+
+    assert clean_command(command) == "for f in *; do\n  echo $f\ndone"
+
+
+def test_json_output_request(stub_server, local_config):
+    stub_server.reply = '{"command": "git status"}'
+    local_config['json_output'] = True
+
+    command = LLMClient(local_config).generate_command("查看仓库状态")
+
+    body = stub_server.chat_requests()[0]['body']
+    assert body['response_format'] == {"type": "json_object"}
+    assert 'stop' not in body
+    assert clean_command(command) == "git status"